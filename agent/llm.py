@@ -5,12 +5,89 @@ Generates MiniMe responses using OpenAI GPT with the soul prompt.
 Maintains conversation history for context.
 """
 
+import re
 import sys
+from typing import AsyncIterator, Optional
 
-from openai import OpenAI
+import numpy as np
 
 from agent.prompt_loader import load_system_prompt
-from config import LLM_MAX_TOKENS, LLM_MODEL, LLM_TEMPERATURE, OPENAI_API_KEY
+from clients import get_openai_client
+from config import (
+    EMBEDDING_MODEL,
+    LLM_MAX_HISTORY_TOKENS,
+    LLM_MAX_TOKENS,
+    LLM_MODEL,
+    LLM_TEMPERATURE,
+    OPENAI_API_KEY,
+    RESPONSE_CACHE_SEMANTIC,
+    RESPONSE_CACHE_SIMILARITY,
+    RESPONSE_CACHE_SIZE,
+)
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# End of a sentence: terminal punctuation followed by whitespace. The end of the
+# buffer is not treated as a boundary mid-stream ("3." may still become "3.5").
+_SENTENCE_END = re.compile(r"[.!?]\s")
+
+# Words of a user message, used to normalize response cache keys
+_WORD = re.compile(r"[a-z0-9']+")
+
+# Tokenizer for LLM_MODEL (None until load_tokenizer() runs, False if unavailable)
+_encoding = None
+
+
+def load_tokenizer():
+    """
+    Loads the tiktoken encoding for LLM_MODEL. The first load may download the
+    encoding file, so call this once at startup, off the event loop. If tiktoken
+    is not installed or the encoding can't be loaded (e.g. offline), the failure
+    is remembered and token counts keep using the estimate.
+    """
+    global _encoding
+    if _encoding is not None:
+        return
+    if tiktoken is None:
+        _encoding = False
+        return
+    try:
+        try:
+            _encoding = tiktoken.encoding_for_model(LLM_MODEL)
+        except KeyError:
+            _encoding = tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        print(f"⚠️  Could not load tokenizer, estimating token counts: {e}", file=sys.stderr, flush=True)
+        _encoding = False
+
+
+def count_tokens(text: str) -> int:
+    """
+    Counts the tokens in text for LLM_MODEL.
+    Uses a ~4 characters per token estimate until load_tokenizer() has loaded
+    the encoding (or if it couldn't), so counting never blocks on a download.
+    
+    Args:
+        text (str): Text to count
+        
+    Returns:
+        int: Number of tokens
+    """
+    if not _encoding:
+        return len(text) // 4 + 1
+    return len(_encoding.encode(text))
+
+
+def _cache_key(user_message: str, previous_reply: Optional[str]) -> tuple:
+    """
+    Builds the response cache key for a user message: the message normalized (case,
+    punctuation and spacing ignored) together with the reply it follows, so context-dependent
+    messages like "yes" or "why?" only hit the cache after the same reply.
+    """
+    return (previous_reply, " ".join(_WORD.findall(user_message.lower())))
 
 
 class ConversationManager:
@@ -24,25 +101,136 @@ class ConversationManager:
         self.conversation_history = [
             {"role": "system", "content": self.system_prompt}
         ]
-        self.client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
+        # Token count of each message after the system prompt, aligned with conversation_history[1:]
+        self.history_token_counts = []
+        self.client = get_openai_client()
+        
+        # Replies to previous user messages, keyed by _cache_key (kept across resets, so
+        # opening messages like "hello" are answered from the cache in later conversations)
+        self.response_cache = {}
+        # Unit-length embeddings of the cached messages, row-aligned with response_cache
+        self.cache_embeddings = None
     
     def add_user_message(self, user_message: str):
         """Add user message to conversation history."""
         self.conversation_history.append({"role": "user", "content": user_message})
+        self.history_token_counts.append(count_tokens(user_message))
     
     def add_assistant_message(self, assistant_message: str):
-        """Add assistant response to conversation history."""
+        """Add assistant response to conversation history and trim it to the token budget."""
         self.conversation_history.append({"role": "assistant", "content": assistant_message})
+        self.history_token_counts.append(count_tokens(assistant_message))
+        self.trim_history()
+    
+    def trim_history(self):
+        """
+        Drops the oldest turns until the history (excluding the system prompt) fits
+        in LLM_MAX_HISTORY_TOKENS. A turn is a user message and everything up to the
+        next user message, so the history always starts with a user message after the
+        system prompt. The latest turn is always kept.
+        """
+        history = self.conversation_history
+        while sum(self.history_token_counts) > LLM_MAX_HISTORY_TOKENS:
+            # The oldest turn runs from index 1 up to the next user message
+            end = next((i for i in range(2, len(history)) if history[i]["role"] == "user"), None)
+            if end is None:
+                break
+            del history[1:end]
+            del self.history_token_counts[:end - 1]
+    
+    def _finish_interrupted_turn(self, partial_response: str):
+        """
+        Closes a turn whose reply was cut off (barge-in, cancellation or an error), so the
+        history never ends with an unanswered user message. The partial reply is kept if
+        any was generated; otherwise the user message is dropped.
+        """
+        if partial_response:
+            self.add_assistant_message(partial_response)
+        else:
+            self.conversation_history.pop()
+            self.history_token_counts.pop()
+    
+    async def _embed(self, text: str) -> np.ndarray:
+        """Returns the unit-length embedding of text."""
+        result = await self.client.embeddings.create(model=EMBEDDING_MODEL, input=text)
+        embedding = np.asarray(result.data[0].embedding, dtype=np.float32)
+        return embedding / np.linalg.norm(embedding)
+    
+    def _previous_reply(self) -> Optional[str]:
+        """Returns the assistant reply the next user message follows (None at the start of a conversation)."""
+        for message in reversed(self.conversation_history):
+            if message["role"] == "assistant":
+                return message["content"]
+            if message["role"] == "system":
+                return None
+        return None
     
-    def generate_response(self, user_message: str) -> str:
+    def _find_similar(self, embedding: np.ndarray, previous_reply: Optional[str]) -> Optional[str]:
         """
-        Generates a MiniMe response using the LLM with conversation history.
+        Returns the cached reply whose message is most similar to embedding, if similar enough.
+        Only messages that followed the same previous reply are considered.
+        """
+        if self.cache_embeddings is None or len(self.cache_embeddings) == 0:
+            return None
+        same_context = np.fromiter(
+            (key[0] == previous_reply for key in self.response_cache),
+            dtype=bool,
+            count=len(self.response_cache)
+        )
+        similarities = np.where(same_context, self.cache_embeddings @ embedding, -1.0)
+        best = int(np.argmax(similarities))
+        if similarities[best] < RESPONSE_CACHE_SIMILARITY:
+            return None
+        return list(self.response_cache.values())[best]
+    
+    def _cache_response(self, key: tuple, embedding: Optional[np.ndarray], response: str):
+        """Stores a reply in the response cache, evicting the oldest entry when full."""
+        if key in self.response_cache or not response:
+            return
+        if len(self.response_cache) >= RESPONSE_CACHE_SIZE:
+            del self.response_cache[next(iter(self.response_cache))]
+            if self.cache_embeddings is not None:
+                self.cache_embeddings = self.cache_embeddings[1:]
+        self.response_cache[key] = response
+        if embedding is not None:
+            row = embedding[np.newaxis, :]
+            if self.cache_embeddings is None or len(self.cache_embeddings) == 0:
+                self.cache_embeddings = row
+            else:
+                self.cache_embeddings = np.vstack([self.cache_embeddings, row])
+    
+    async def lookup_cached_response(self, user_message: str, previous_reply: Optional[str]):
+        """
+        Looks up a cached reply for a user message.
         
         Args:
             user_message (str): The user's transcribed message
+            previous_reply (str, optional): The assistant reply the message follows
             
         Returns:
-            str: MiniMe's response text
+            tuple: (cached reply or None, embedding of the message or None)
+        """
+        if RESPONSE_CACHE_SIZE <= 0:
+            return None, None
+        
+        cached = self.response_cache.get(_cache_key(user_message, previous_reply))
+        if cached is not None or not RESPONSE_CACHE_SEMANTIC:
+            return cached, None
+        
+        embedding = await self._embed(user_message)
+        return self._find_similar(embedding, previous_reply), embedding
+    
+    async def stream_response(self, user_message: str) -> AsyncIterator[str]:
+        """
+        Streams a MiniMe response token by token using the LLM with conversation history.
+        The full response is added to the history once the stream completes
+        (or whatever was generated, if the stream is cut off).
+        
+        Args:
+            user_message (str): The user's transcribed message
+            
+        Yields:
+            str: Response text deltas as they arrive from the LLM
             
         Raises:
             ValueError: If API key is not configured
@@ -55,40 +243,84 @@ class ConversationManager:
             )
         
         if not user_message or not user_message.strip():
-            return "I didn't catch that. Can you repeat?"
+            yield "I didn't catch that. Can you repeat?"
+            return
+        
+        # Add user message to history
+        previous_reply = self._previous_reply()
+        self.add_user_message(user_message)
+        parts = []
         
         try:
-            # Add user message to history
-            self.add_user_message(user_message)
+
+            # Answer repeated messages from the cache, skipping the LLM entirely
+            cached, embedding = await self.lookup_cached_response(user_message, previous_reply)
+            if cached is not None:
+                self.add_assistant_message(cached)
+                print(f"💭 MiniMe (cached): {cached}", flush=True)
+                yield cached
+                return
             
             print("🤖 Generating MiniMe response...", flush=True)
             
-            # Generate response with full conversation history
-            response = self.client.chat.completions.create(
+            # Stream response with full conversation history
+            response = await self.client.chat.completions.create(
                 model=LLM_MODEL,
                 messages=self.conversation_history,
                 temperature=LLM_TEMPERATURE,
-                max_tokens=LLM_MAX_TOKENS
+                max_tokens=LLM_MAX_TOKENS,
+                stream=True
             )
             
-            mini_response = response.choices[0].message.content.strip()
+            async for chunk in response:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    yield delta
+            
+            mini_response = "".join(parts).strip()
             
             # Add assistant response to history
             self.add_assistant_message(mini_response)
+            if RESPONSE_CACHE_SIZE > 0:
+                self._cache_response(_cache_key(user_message, previous_reply), embedding, mini_response)
             
             print(f"💭 MiniMe: {mini_response}", flush=True)
-            return mini_response
             
         except Exception as e:
             error_msg = f"Error generating LLM response: {str(e)}"
             print(error_msg, file=sys.stderr, flush=True)
             raise Exception(error_msg) from e
+        finally:
+            # The reply never completed (e.g. the consumer was cancelled mid-stream)
+            if self.conversation_history[-1]["role"] == "user":
+                self._finish_interrupted_turn("".join(parts).strip())
+    
+    async def generate_response(self, user_message: str) -> str:
+        """
+        Generates a complete MiniMe response using the LLM with conversation history.
+        
+        Args:
+            user_message (str): The user's transcribed message
+            
+        Returns:
+            str: MiniMe's response text
+            
+        Raises:
+            ValueError: If API key is not configured
+            Exception: For other LLM errors
+        """
+        parts = [delta async for delta in self.stream_response(user_message)]
+        return "".join(parts).strip()
     
     def reset(self):
-        """Reset conversation history (keep system prompt)."""
+        """Reset conversation history (keep system prompt and the response cache)."""
         self.conversation_history = [
             {"role": "system", "content": self.system_prompt}
         ]
+        self.history_token_counts = []
 
 
 # Global conversation manager instance
@@ -103,7 +335,7 @@ def get_conversation_manager():
     return _conversation_manager
 
 
-def generate_response(user_message: str) -> str:
+async def generate_response(user_message: str) -> str:
     """
     Generates a MiniMe response using the LLM with conversation history.
     
@@ -114,7 +346,48 @@ def generate_response(user_message: str) -> str:
         str: MiniMe's response text
     """
     manager = get_conversation_manager()
-    return manager.generate_response(user_message)
+    return await manager.generate_response(user_message)
+
+
+def stream_response(user_message: str) -> AsyncIterator[str]:
+    """
+    Streams a MiniMe response token by token using the LLM with conversation history.
+    
+    Args:
+        user_message (str): The user's transcribed message
+        
+    Yields:
+        str: Response text deltas as they arrive from the LLM
+    """
+    manager = get_conversation_manager()
+    return manager.stream_response(user_message)
+
+
+async def stream_sentences(user_message: str) -> AsyncIterator[str]:
+    """
+    Streams a MiniMe response one complete sentence at a time, so each sentence
+    can be sent to TTS while the LLM is still generating the rest.
+    
+    Args:
+        user_message (str): The user's transcribed message
+        
+    Yields:
+        str: Complete sentences of the response, in order
+    """
+    buffer = ""
+    async for delta in stream_response(user_message):
+        buffer += delta
+        match = _SENTENCE_END.search(buffer)
+        while match:
+            sentence = buffer[:match.end()].strip()
+            buffer = buffer[match.end():]
+            if sentence:
+                yield sentence
+            match = _SENTENCE_END.search(buffer)
+    
+    # Flush whatever is left after the stream ends
+    if buffer.strip():
+        yield buffer.strip()
 
 
 def reset_conversation():
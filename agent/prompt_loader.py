@@ -4,7 +4,8 @@ MiniMe Prompt Loader Module
 Loads the system prompt from soul_prompt.txt for MiniMe's dual-personality system.
 """
 
-from pathlib import Path
+import functools
+import os
 
 from config import SOUL_PROMPT_FILE
 
@@ -12,6 +13,7 @@ from config import SOUL_PROMPT_FILE
 def load_system_prompt() -> str:
     """
     Loads the MiniMe system prompt (soul_prompt.txt) and returns it as a string.
+    The file is only re-read when its modification time changes.
     
     Returns:
         str: The complete system prompt text
@@ -21,12 +23,28 @@ def load_system_prompt() -> str:
         ValueError: If the file is empty
         IOError: If there's an error reading the file
     """
-    if not SOUL_PROMPT_FILE.exists():
+    try:
+        mtime = os.stat(SOUL_PROMPT_FILE).st_mtime
+    except FileNotFoundError:
         raise FileNotFoundError(
             f"System prompt file not found: {SOUL_PROMPT_FILE}\n"
             "Please create soul_prompt.txt in the agent/ directory and paste your MiniMe prompt."
-        )
+        ) from None
+    
+    return _read_system_prompt(mtime)
+
+
+@functools.lru_cache(maxsize=1)
+def _read_system_prompt(mtime: float) -> str:
+    """
+    Reads soul_prompt.txt. Cached on the file's mtime so repeated loads skip disk I/O.
     
+    Args:
+        mtime (float): Modification time of soul_prompt.txt (cache key)
+        
+    Returns:
+        str: The complete system prompt text
+    """
     try:
         with open(SOUL_PROMPT_FILE, 'r', encoding='utf-8') as f:
             prompt = f.read()
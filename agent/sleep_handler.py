@@ -4,6 +4,25 @@ MiniMe Sleep Mode Handler
 Detects sleep commands and handles sleep mode transitions.
 """
 
+import re
+
+from config import SLEEP_PHRASES
+
+# Phrases longest first, so the compiled pattern is the same on every run regardless of set order
+_ORDERED_PHRASES = sorted(SLEEP_PHRASES, key=lambda phrase: (-len(phrase), phrase))
+
+# Single-pass, case-insensitive matcher for whole-word sleep phrases
+_SLEEP_RE = re.compile(
+    r"\b(?:" + "|".join(map(re.escape, _ORDERED_PHRASES)) + r")\b",
+    re.IGNORECASE
+)
+
+# First letters of the sleep phrases, in both cases. Every match starts with one of
+# them, so text containing none of these characters can be rejected without the regex.
+_SLEEP_INITIALS = frozenset(
+    ch for phrase in SLEEP_PHRASES for ch in (phrase[0], phrase[0].upper())
+)
+
 def is_sleep_command(text: str) -> bool:
     """
     Returns True if the user text contains any sleep-mode command.
@@ -14,37 +33,10 @@ def is_sleep_command(text: str) -> bool:
     Returns:
         bool: True if a sleep command is detected
     """
-    if not text:
+    if not text or _SLEEP_INITIALS.isdisjoint(text):
         return False
     
-    # Normalize text to lowercase for case-insensitive matching
-    text_lower = text.lower().strip()
-    
-    # List of sleep command phrases
-    sleep_phrases = [
-        "ok bye",
-        "okay bye",
-        "goodbye",
-        "good bye",
-        "bye",
-        "bye minime",
-        "sleep",
-        "go to sleep",
-        "rest",
-        "rest now",
-        "quiet",
-        "go away",
-        "stop",
-        "later",
-        "you can sleep"
-    ]
-    
-    # Check if any sleep phrase is in the text
-    for phrase in sleep_phrases:
-        if phrase in text_lower:
-            return True
-    
-    return False
+    return _SLEEP_RE.search(text) is not None
 
 def get_sleep_message() -> str:
     """
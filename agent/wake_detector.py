@@ -4,16 +4,13 @@ MiniMe Wake Word Detector Module
 Detects "Hey MiniMe" wake word using Picovoice Porcupine.
 """
 
-import contextlib
-import io
 import os
 import sys
 
-import numpy as np
 import pvporcupine
-import pyaudio
 
-from config import PICOVOICE_KEY, PROJECT_ROOT, WAKE_WORD_MODEL
+from audio._pa import get_input_stream
+from config import PICOVOICE_KEY, WAKE_WORD_MODEL_PATH
 
 
 class WakeWordDetector:
@@ -22,21 +19,20 @@ class WakeWordDetector:
     def __init__(self):
         """Initialize the wake word detector."""
         self.porcupine = None
-        self.pa = None
         self.audio_stream = None
         self._initialize()
     
     def _initialize(self):
-        """Initialize Porcupine and PyAudio."""
+        """Initialize Porcupine and the shared PyAudio input stream."""
         if not PICOVOICE_KEY or PICOVOICE_KEY == 'your_picovoice_access_key_here':
             raise ValueError(
                 "PICOVOICE_KEY not found in keys.env. "
                 "Get your key from: https://console.picovoice.ai/"
             )
         
-        if not WAKE_WORD_MODEL.exists():
+        if not os.path.exists(WAKE_WORD_MODEL_PATH):
             raise FileNotFoundError(
-                f"Wake word model file not found: {WAKE_WORD_MODEL}\n"
+                f"Wake word model file not found: {WAKE_WORD_MODEL_PATH}\n"
                 "Please place your minime.ppn file in the wakeword/ directory"
             )
         
@@ -44,43 +40,40 @@ class WakeWordDetector:
         try:
             self.porcupine = pvporcupine.create(
                 access_key=PICOVOICE_KEY,
-                keyword_paths=[str(WAKE_WORD_MODEL)]
+                keyword_paths=[WAKE_WORD_MODEL_PATH]
             )
         except Exception as e:
             raise Exception(f"Failed to initialize Porcupine: {e}") from e
         
-        # Initialize PyAudio (suppress macOS PortAudio warnings)
-        with contextlib.redirect_stderr(io.StringIO()):
-            self.pa = pyaudio.PyAudio()
-        
-        # Open audio stream
-        self.audio_stream = self.pa.open(
-            rate=self.porcupine.sample_rate,
-            channels=1,
-            format=pyaudio.paInt16,
-            input=True,
-            frames_per_buffer=self.porcupine.frame_length
+        # Open (or reuse) the shared input stream; it stays open across turns
+        self.audio_stream = get_input_stream(
+            self.porcupine.sample_rate,
+            self.porcupine.frame_length
         )
     
-    def listen_for_wake_word(self):
+    def listen_for_wake_word(self, stop_event=None):
         """
         Listens continuously for the wake word.
         
+        Args:
+            stop_event (threading.Event, optional): Stops listening when set
+        
         Returns:
-            bool: True when wake word is detected
+            bool: True when wake word is detected, False if stopped or interrupted
         """
         try:
-            while True:
-                # Read audio frame
-                pcm = self.audio_stream.read(self.porcupine.frame_length)
-                # Convert bytes to numpy array of int16
-                pcm = np.frombuffer(pcm, dtype=np.int16)
+            while stop_event is None or not stop_event.is_set():
+                # Read audio frame (the stream keeps filling while we are not
+                # listening, so overflow between listens is expected)
+                pcm = self.audio_stream.read(self.porcupine.frame_length, exception_on_overflow=False)
                 
-                # Check for wake word
-                keyword_index = self.porcupine.process(pcm)
+                # Check for wake word (zero-copy int16 view of the frame, no NumPy array per frame)
+                keyword_index = self.porcupine.process(memoryview(pcm).cast('h'))
                 
                 if keyword_index >= 0:
                     return True
+            
+            return False
                     
         except KeyboardInterrupt:
             print("\n⚠️  Interrupted by user", flush=True)
@@ -90,10 +83,8 @@ class WakeWordDetector:
             return False
     
     def cleanup(self):
-        """Clean up resources."""
-        if self.audio_stream:
-            self.audio_stream.close()
-        if self.pa:
-            self.pa.terminate()
+        """Clean up resources (the shared audio stream is closed at process exit)."""
+        if self.audio_stream and self.audio_stream.is_active():
+            self.audio_stream.stop_stream()
         if self.porcupine:
             self.porcupine.delete()
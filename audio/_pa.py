@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+MiniMe Shared PyAudio Module
+Keeps a single PyAudio instance and open input streams for the whole process,
+so recorder and wake word detector don't re-initialize PortAudio every turn.
+"""
+
+import atexit
+import contextlib
+import io
+import threading
+
+import pyaudio
+
+# PyAudio constants
+FORMAT = pyaudio.paInt16
+
+_pa = None
+_streams = {}
+_lock = threading.Lock()
+
+
+def get_pyaudio() -> pyaudio.PyAudio:
+    """Get or create the shared PyAudio instance."""
+    global _pa
+    with _lock:
+        if _pa is None:
+            # Suppress PortAudio macOS warnings
+            with contextlib.redirect_stderr(io.StringIO()):
+                _pa = pyaudio.PyAudio()
+        return _pa
+
+
+def get_input_stream(rate: int, frames_per_buffer: int, channels: int = 1, stream_callback=None):
+    """
+    Returns a started 16-bit input stream, opening it on first use.
+    Streams are cached per (rate, frames_per_buffer, channels, stream_callback)
+    and stay open until the process exits; callers stop them, never close them.
+
+    Args:
+        rate (int): Sample rate in Hz
+        frames_per_buffer (int): Frames per buffer (and per callback, in callback mode)
+        channels (int): Number of input channels
+        stream_callback (callable, optional): PyAudio callback for callback mode
+
+    Returns:
+        pyaudio.Stream: The open, started input stream
+    """
+    pa = get_pyaudio()
+    key = (rate, frames_per_buffer, channels, stream_callback)
+
+    with _lock:
+        stream = _streams.get(key)
+        if stream is None:
+            # Open audio stream (suppress PortAudio warnings)
+            with contextlib.redirect_stderr(io.StringIO()):
+                stream = pa.open(
+                    format=FORMAT,
+                    channels=channels,
+                    rate=rate,
+                    input=True,
+                    frames_per_buffer=frames_per_buffer,
+                    stream_callback=stream_callback
+                )
+            _streams[key] = stream
+        elif stream.is_stopped():
+            stream.start_stream()
+
+        return stream
+
+
+@atexit.register
+def terminate():
+    """Close all cached streams and terminate PyAudio."""
+    global _pa
+    with _lock:
+        for stream in _streams.values():
+            stream.close()
+        _streams.clear()
+        if _pa is not None:
+            _pa.terminate()
+            _pa = None
@@ -5,13 +5,14 @@ Records audio from microphone after wake word detection.
 Returns audio data in memory (no disk I/O).
 """
 
-import contextlib
 import io
+import queue
 import struct
-import wave
 
+import numpy as np
 import pyaudio
 
+from audio._pa import FORMAT, get_input_stream
 from config import (
     AUDIO_CHUNK,
     AUDIO_CHANNELS,
@@ -19,19 +20,43 @@ from config import (
     AUTO_STOP_DURATION,
     MAX_RECORDING_DURATION,
     SILENCE_DURATION,
-    SILENCE_THRESHOLD,
+    SILENCE_THRESHOLD_SQ,
 )
 
-# PyAudio constants
-FORMAT = pyaudio.paInt16
+# Analysis frames delivered per PortAudio callback (larger buffers mean fewer wakeups)
+FRAMES_PER_CALLBACK = 4
 
+# Seconds to wait for the next audio block before giving up on the stream
+READ_TIMEOUT = 2.0
 
-def record_until_silence(max_duration=MAX_RECORDING_DURATION):
+# 16-bit PCM WAV header; the RIFF and data chunk sizes are patched in per recording
+_SAMPLE_WIDTH = pyaudio.get_sample_size(FORMAT)
+_WAV_HEADER = struct.pack(
+    '<4sI4s4sIHHIIHH4sI',
+    b'RIFF', 0, b'WAVE',
+    b'fmt ', 16, 1, AUDIO_CHANNELS, AUDIO_RATE,
+    AUDIO_RATE * AUDIO_CHANNELS * _SAMPLE_WIDTH, AUDIO_CHANNELS * _SAMPLE_WIDTH, _SAMPLE_WIDTH * 8,
+    b'data', 0
+)
+_WAV_HEADER_SIZE = len(_WAV_HEADER)
+
+# Audio blocks are pushed here from PortAudio's callback thread
+_audio_blocks = queue.SimpleQueue()
+
+
+def _on_audio(in_data, frame_count, time_info, status):
+    """PyAudio stream callback: hands each captured block to the recording loop."""
+    _audio_blocks.put(in_data)
+    return (None, pyaudio.paContinue)
+
+
+def record_until_silence(max_duration=MAX_RECORDING_DURATION, stop_event=None):
     """
     Records audio from microphone until silence is detected or max duration reached.
     
     Args:
         max_duration (float): Maximum recording duration in seconds
+        stop_event (threading.Event, optional): Ends the recording early when set
         
     Returns:
         io.BytesIO: In-memory WAV file containing the recorded audio
@@ -39,90 +64,111 @@ def record_until_silence(max_duration=MAX_RECORDING_DURATION):
     Raises:
         Exception: If recording fails
     """
-    pa = None
     stream = None
     
     try:
-        # Suppress PortAudio macOS warnings
-        with contextlib.redirect_stderr(io.StringIO()):
-            pa = pyaudio.PyAudio()
+        # Drop blocks left over from the end of the previous recording
+        while not _audio_blocks.empty():
+            _audio_blocks.get_nowait()
         
-        # Open audio stream (suppress PortAudio warnings)
-        with contextlib.redirect_stderr(io.StringIO()):
-            stream = pa.open(
-                format=FORMAT,
-                channels=AUDIO_CHANNELS,
-                rate=AUDIO_RATE,
-                input=True,
-                frames_per_buffer=AUDIO_CHUNK
-            )
+        # Start the shared callback-mode input stream (opened once per process)
+        stream = get_input_stream(
+            AUDIO_RATE,
+            AUDIO_CHUNK * FRAMES_PER_CALLBACK,
+            channels=AUDIO_CHANNELS,
+            stream_callback=_on_audio
+        )
         
-        frames = []
         silence_frame_count = int(SILENCE_DURATION * AUDIO_RATE / AUDIO_CHUNK)
         max_frames = int(max_duration * AUDIO_RATE / AUDIO_CHUNK)
         frame_count = 0
         
+        # Preallocate the WAV file (header + maximum duration of audio) and fill it in place
+        frame_bytes = AUDIO_CHUNK * AUDIO_CHANNELS * _SAMPLE_WIDTH
+        frames = bytearray(_WAV_HEADER_SIZE + max_frames * frame_bytes)
+        offset = _WAV_HEADER_SIZE
+        
         print("🎤 Recording... (speak now, or stay silent for 2.5 seconds to finish)", flush=True)
         
         # Track recording state
         has_audio = False
         min_audio_frames = int(0.5 * AUDIO_RATE / AUDIO_CHUNK)
-        consecutive_silence = 0
         auto_stop_frames = int(AUTO_STOP_DURATION * AUDIO_RATE / AUDIO_CHUNK)
         
-        while frame_count < max_frames:
-            data = stream.read(AUDIO_CHUNK, exception_on_overflow=False)
-            frames.append(data)
-            frame_count += 1
+        # Sum of squares of the last `silence_frame_count` frames, kept in a ring and
+        # updated incrementally, so the silence window check is O(1) per frame
+        samples_per_frame = AUDIO_CHUNK * AUDIO_CHANNELS
+        frame_threshold = SILENCE_THRESHOLD_SQ * samples_per_frame
+        window_threshold = frame_threshold * silence_frame_count
+        ss_ring = [0] * silence_frame_count
+        ss_sum = 0
+        ring_index = 0
+        
+        done = False
+        while not done and frame_count < max_frames:
+            if stop_event is not None and stop_event.is_set():
+                break
             
-            # Calculate RMS for audio level detection
-            audio_samples = struct.unpack(f'{AUDIO_CHUNK}h', data)
-            rms = int((sum(x*x for x in audio_samples) / len(audio_samples)) ** 0.5)
+            try:
+                block = _audio_blocks.get(timeout=READ_TIMEOUT)
+            except queue.Empty:
+                raise Exception(f"no audio from microphone for {READ_TIMEOUT}s") from None
             
-            # Update audio detection state
-            if rms > SILENCE_THRESHOLD:
-                has_audio = True
-                consecutive_silence = 0
-            else:
-                consecutive_silence += 1
+            # Zero-copy int16 view of the block (no per-sample Python objects)
+            block_view = memoryview(block)
+            samples = np.asarray(block_view.cast('h')).reshape(-1, samples_per_frame)
             
-            # Stop conditions
-            # 1. Silence detected after audio
-            if has_audio and consecutive_silence >= silence_frame_count and frame_count > min_audio_frames:
-                print(f"✅ Recording complete (silence detected after {frame_count * AUDIO_CHUNK / AUDIO_RATE:.1f}s)", flush=True)
-                break
+            # Sum of squares of every frame in the block at once (squared into int64 to avoid overflow)
+            block_ss = np.square(samples, dtype=np.int64).sum(axis=1).tolist()
             
-            # 2. Auto-stop after reasonable duration
-            if has_audio and frame_count >= auto_stop_frames:
-                print(f"✅ Recording complete (auto-stop after {AUTO_STOP_DURATION}s)", flush=True)
-                break
+            for i, ss in enumerate(block_ss):
+                if frame_count >= max_frames:
+                    break
+                
+                frames[offset:offset + frame_bytes] = block_view[i * frame_bytes:(i + 1) * frame_bytes]
+                offset += frame_bytes
+                frame_count += 1
+                
+                # Update audio detection state (frame RMS above threshold)
+                if ss > frame_threshold:
+                    has_audio = True
+                
+                # Slide the silence window forward by one frame
+                ss_sum += ss - ss_ring[ring_index]
+                ss_ring[ring_index] = ss
+                ring_index = (ring_index + 1) % silence_frame_count
+                
+                # Stop conditions
+                # 1. Silence detected after audio (RMS over the full window below threshold)
+                if (has_audio and frame_count >= silence_frame_count
+                        and frame_count > min_audio_frames and ss_sum < window_threshold):
+                    print(f"✅ Recording complete (silence detected after {frame_count * AUDIO_CHUNK / AUDIO_RATE:.1f}s)", flush=True)
+                    done = True
+                    break
+                
+                # 2. Auto-stop after reasonable duration
+                if has_audio and frame_count >= auto_stop_frames:
+                    print(f"✅ Recording complete (auto-stop after {AUTO_STOP_DURATION}s)", flush=True)
+                    done = True
+                    break
         
         # Final check
         if frame_count >= max_frames:
             print(f"✅ Recording complete (max duration reached)", flush=True)
         
-        # Stop stream
+        # Stop stream (kept open for the next recording)
         stream.stop_stream()
-        stream.close()
-        
-        # Create WAV file in memory
-        wav_buffer = io.BytesIO()
-        wf = wave.open(wav_buffer, 'wb')
-        wf.setnchannels(AUDIO_CHANNELS)
-        wf.setsampwidth(pa.get_sample_size(FORMAT))
-        wf.setframerate(AUDIO_RATE)
-        wf.writeframes(b''.join(frames))
-        wf.close()
         
-        # Reset buffer position to beginning for reading
-        wav_buffer.seek(0)
+        # Create WAV file in memory: copy in the header and patch its size fields
+        data_size = offset - _WAV_HEADER_SIZE
+        frames[:_WAV_HEADER_SIZE] = _WAV_HEADER
+        struct.pack_into('<I', frames, 4, offset - 8)
+        struct.pack_into('<I', frames, _WAV_HEADER_SIZE - 4, data_size)
         
-        return wav_buffer
+        return io.BytesIO(memoryview(frames)[:offset])
         
     except Exception as e:
         raise Exception(f"Error recording audio: {str(e)}") from e
     finally:
-        if stream:
-            stream.close()
-        if pa:
-            pa.terminate()
+        if stream and stream.is_active():
+            stream.stop_stream()
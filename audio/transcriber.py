@@ -8,12 +8,11 @@ Accepts audio data directly in memory (no disk I/O).
 import io
 import sys
 
-from openai import OpenAI
-
+from clients import get_openai_client
 from config import OPENAI_API_KEY
 
 
-def transcribe_audio(audio_data: io.BytesIO) -> str:
+async def transcribe_audio(audio_data: io.BytesIO) -> str:
     """
     Transcribes audio data to text using OpenAI Whisper API.
     
@@ -37,8 +36,6 @@ def transcribe_audio(audio_data: io.BytesIO) -> str:
         raise ValueError("Audio data is required for transcription")
     
     try:
-        client = OpenAI(api_key=OPENAI_API_KEY)
-        
         print("🔄 Transcribing audio...", flush=True)
         
         # Reset buffer position to beginning
@@ -47,7 +44,7 @@ def transcribe_audio(audio_data: io.BytesIO) -> str:
         # Create a file-like object with a filename for Whisper API
         audio_data.name = "audio.wav"
         
-        transcript = client.audio.transcriptions.create(
+        transcript = await get_openai_client().audio.transcriptions.create(
             model="whisper-1",
             file=audio_data,
             language="en"
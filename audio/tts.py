@@ -5,15 +5,35 @@ Uses ElevenLabs TTS API to convert text to speech and play it.
 Extracts audio levels for mouth animation.
 """
 
-import io
-import struct
+import asyncio
+import shutil
 import sys
-import wave
+import threading
+from typing import AsyncIterable
 
-from elevenlabs.client import ElevenLabs
-from elevenlabs.play import play
+import numpy as np
 
-from config import ELEVEN_API_KEY, ELEVEN_VOICE_ID, TTS_MODEL
+from clients import get_elevenlabs_client
+from config import (
+    ELEVEN_API_KEY,
+    ELEVEN_VOICE_ID,
+    TTS_MODEL,
+    TTS_OUTPUT_FORMAT,
+    TTS_SAMPLE_RATE,
+)
+
+# Set to cut MiniMe off mid-speech (e.g. when the wake word is heard during playback)
+_interrupt_event = threading.Event()
+
+# Player for the reply currently being spoken (killed by interrupt_speech)
+_current_player = None
+
+# Seconds of audio covered by each "talk" level update sent to the frontend (~20 Hz)
+_LEVELS_SEND_INTERVAL = 0.05
+
+# TTS audio is 16-bit mono PCM
+_BYTES_PER_SECOND = TTS_SAMPLE_RATE * 2
+_LEVELS_WINDOW_BYTES = int(TTS_SAMPLE_RATE * _LEVELS_SEND_INTERVAL) * 2
 
 # Import WebSocket sender (will be None if not available)
 try:
@@ -27,44 +47,26 @@ def extract_audio_levels(audio_bytes: bytes, chunk_size: int = 1024) -> list:
     Extract amplitude levels from audio bytes for mouth animation.
     
     Args:
-        audio_bytes: Raw audio data (PCM)
+        audio_bytes: Raw audio data (16-bit mono PCM)
         chunk_size: Size of each analysis chunk
         
     Returns:
         List of normalized amplitude levels (0-1) for 12 frequency bands
     """
     try:
-        # Try to parse as WAV
-        audio_io = io.BytesIO(audio_bytes)
-        wav_file = wave.open(audio_io, 'rb')
+        # View as 16-bit integers (no copy; a trailing odd byte is dropped)
+        samples = np.frombuffer(audio_bytes, dtype=np.int16, count=len(audio_bytes) // 2)
         
-        # Read audio data
-        frames = wav_file.readframes(wav_file.getnframes())
-        wav_file.close()
-        
-        # Convert to 16-bit integers
-        samples = struct.unpack(f'{len(frames)//2}h', frames)
-        
-        # Calculate RMS for chunks
+        # Calculate RMS for 12 equal chunks (trailing remainder samples are dropped)
         num_chunks = 12
         chunk_length = len(samples) // num_chunks
-        levels = []
+        if chunk_length == 0:
+            return [0.0] * num_chunks
         
-        for i in range(num_chunks):
-            start = i * chunk_length
-            end = start + chunk_length
-            chunk = samples[start:end] if end <= len(samples) else samples[start:]
-            
-            if chunk:
-                # Calculate RMS (root mean square) for amplitude
-                rms = (sum(x * x for x in chunk) / len(chunk)) ** 0.5
-                # Normalize to 0-1 range (assuming max 16-bit value ~32768)
-                normalized = min(rms / 16384.0, 1.0)
-                levels.append(normalized)
-            else:
-                levels.append(0.0)
-        
-        return levels[:12]  # Return exactly 12 values
+        chunks = samples[:chunk_length * num_chunks].reshape(num_chunks, -1).astype(np.float32)
+        rms = np.sqrt((chunks * chunks).mean(axis=1))
+        # Normalize to 0-1 range (assuming max 16-bit value ~32768)
+        return np.minimum(rms / 16384.0, 1.0).tolist()
         
     except Exception as e:
         # If parsing fails, return zero levels
@@ -72,10 +74,199 @@ def extract_audio_levels(audio_bytes: bytes, chunk_size: int = 1024) -> list:
         return [0.0] * 12
 
 
-def speak_text(text: str):
+def interrupt_speech():
+    """Stops the current speech playback and skips any sentences still queued."""
+    _interrupt_event.set()
+    player = _current_player
+    if player is not None:
+        player.kill()
+
+
+class _Player:
+    """
+    A single ffplay process that plays a whole reply. Audio chunks are written to
+    its stdin as they arrive, so playback starts with the first chunk and runs on
+    across sentence boundaries without restarting the player.
+    Audio levels are sent to the frontend when the audio they describe is played.
+    """
+    
+    def __init__(self):
+        """Initialize an unstarted player."""
+        self.proc = None
+        self.killed = False
+        # Loop time at which the audio written so far finishes playing
+        self.play_end = 0.0
+        # Audio not yet covered by a level update, and the loop time it starts playing
+        self.level_audio = bytearray()
+        self.level_start = 0.0
+        self.level_handles = []
+    
+    async def start(self):
+        """
+        Starts ffplay, reading audio from stdin.
+        
+        Raises:
+            ValueError: If ffplay is not installed
+        """
+        if not shutil.which("ffplay"):
+            raise ValueError("ffplay not found, necessary to play audio. Install ffmpeg to get it.")
+        
+        self.proc = await asyncio.create_subprocess_exec(
+            "ffplay", "-autoexit", "-nodisp", "-loglevel", "quiet",
+            "-f", "s16le", "-ar", str(TTS_SAMPLE_RATE), "-",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+    
+    async def write(self, chunk: bytes) -> bool:
+        """
+        Queues an audio chunk for playback and sends audio levels to the frontend.
+        
+        Args:
+            chunk (bytes): Raw 16-bit mono PCM at TTS_SAMPLE_RATE
+            
+        Returns:
+            bool: False if the player was killed and no more audio should be written
+        """
+        if self.killed:
+            return False
+        
+        # Track when this chunk plays: after the audio already written, or right
+        # away if playback has caught up (e.g. while waiting for the next sentence)
+        loop = asyncio.get_running_loop()
+        chunk_start = max(self.play_end, loop.time())
+        self.play_end = chunk_start + len(chunk) / _BYTES_PER_SECOND
+        
+        if send_to_ui:
+            self._schedule_levels(loop, chunk, chunk_start)
+        
+        try:
+            self.proc.stdin.write(chunk)
+            await self.proc.stdin.drain()
+        except ConnectionError:
+            # ffplay exited (killed by an interrupt)
+            return False
+        return True
+    
+    def _schedule_levels(self, loop: asyncio.AbstractEventLoop, chunk: bytes, chunk_start: float):
+        """
+        Extracts levels for mouth animation from every full _LEVELS_SEND_INTERVAL of
+        audio and schedules each "talk" update for the moment that audio plays.
+        """
+        if not self.level_audio:
+            self.level_start = chunk_start
+        self.level_audio += chunk
+        
+        while len(self.level_audio) >= _LEVELS_WINDOW_BYTES:
+            levels = extract_audio_levels(bytes(self.level_audio[:_LEVELS_WINDOW_BYTES]))
+            del self.level_audio[:_LEVELS_WINDOW_BYTES]
+            self.level_handles.append(
+                loop.call_at(self.level_start, send_to_ui, {"event": "talk", "levels": levels})
+            )
+            self.level_start += _LEVELS_SEND_INTERVAL
+    
+    async def finish(self):
+        """Closes ffplay's input and waits until playback ends (or the player is killed)."""
+        if not self.killed:
+            try:
+                self.proc.stdin.close()
+            except ConnectionError:
+                pass
+        await self.proc.wait()
+    
+    def kill(self):
+        """Stops playback immediately and drops level updates that haven't been sent."""
+        self.killed = True
+        for handle in self.level_handles:
+            handle.cancel()
+        self.level_handles.clear()
+        if self.proc is not None and self.proc.returncode is None:
+            self.proc.kill()
+
+
+async def _synthesize(text: str, chunks: asyncio.Queue):
+    """
+    Streams speech for text from ElevenLabs into a queue as it arrives.
+    The queue ends with None, or with the exception that stopped synthesis.
+    
+    Args:
+        text (str): The text to convert to speech
+        chunks (asyncio.Queue): Receives audio chunks (bytes) in playback order
+    """
+    try:
+        audio_stream = get_elevenlabs_client().text_to_speech.stream(
+            voice_id=ELEVEN_VOICE_ID,
+            text=text,
+            model_id=TTS_MODEL,
+            output_format=TTS_OUTPUT_FORMAT
+        )
+        async for chunk in audio_stream:
+            if chunk:
+                chunks.put_nowait(chunk)
+        chunks.put_nowait(None)
+    except Exception as e:
+        chunks.put_nowait(e)
+
+
+def _tts_error(e: Exception) -> Exception:
+    """
+    Builds a user-friendly exception for an ElevenLabs API error and prints it.
+    
+    Args:
+        e (Exception): The original ElevenLabs error
+        
+    Returns:
+        Exception: Exception carrying the user-facing error message
+    """
+    # Parse ElevenLabs API errors for better user feedback
+    error_str = str(e)
+    
+    # Check for permission errors
+    if "missing_permissions" in error_str or "text_to_speech" in error_str.lower():
+        error_msg = (
+            "❌ ElevenLabs API Error: Your API key is missing the 'text_to_speech' permission.\n"
+            "   Please go to https://elevenlabs.io/ and:\n"
+            "   1. Check your API key permissions\n"
+            "   2. Ensure 'text_to_speech' permission is enabled\n"
+            "   3. Update your API key in keys.env if needed"
+        )
+    elif "401" in error_str or "unauthorized" in error_str.lower():
+        error_msg = (
+            "❌ ElevenLabs API Error: Invalid or unauthorized API key.\n"
+            "   Please check your ELEVEN_API_KEY in keys.env"
+        )
+    elif "quota" in error_str.lower() or "limit" in error_str.lower():
+        error_msg = (
+            "❌ ElevenLabs API Error: Quota exceeded or rate limit reached.\n"
+            "   Please check your ElevenLabs account usage"
+        )
+    else:
+        error_msg = f"Error in ElevenLabs TTS: {error_str}"
+    
+    print(error_msg, file=sys.stderr, flush=True)
+    return Exception(error_msg)
+
+
+def _check_api_key():
+    """Raises ValueError if the ElevenLabs API key is not configured."""
+    if not ELEVEN_API_KEY:
+        raise ValueError(
+            "ELEVEN_API_KEY not found in keys.env. "
+            "Please add your ElevenLabs API key to keys.env"
+        )
+
+
+async def _single(text: str):
+    """Yields text as the only sentence of a reply."""
+    yield text
+
+
+async def speak_text(text: str):
     """
     Takes text and plays it out loud using ElevenLabs TTS.
     Sends audio levels to frontend via WebSocket for mouth animation.
+    Playback stops early if interrupt_speech() is called.
     
     Args:
         text (str): The text to convert to speech and play
@@ -84,86 +275,89 @@ def speak_text(text: str):
         ValueError: If API key is not configured
         Exception: For other ElevenLabs API errors
     """
-    if not ELEVEN_API_KEY:
-        raise ValueError(
-            "ELEVEN_API_KEY not found in keys.env. "
-            "Please add your ElevenLabs API key to keys.env"
-        )
+    _check_api_key()
     
     if not text or not text.strip():
         print("Warning: Empty text provided to speak_text", flush=True)
         return
     
-    try:
-        client = ElevenLabs(api_key=ELEVEN_API_KEY)
-        
-        # Generate audio using ElevenLabs API
-        audio_generator = client.text_to_speech.convert(
-            voice_id=ELEVEN_VOICE_ID,
-            text=text,
-            model_id=TTS_MODEL
-        )
-        
-        # Collect audio chunks for level extraction
-        audio_chunks = []
-        frame_size = 4096  # Process in frames
+    await speak_sentences(_single(text))
+
+
+async def speak_sentences(sentences: AsyncIterable[str]):
+    """
+    Speaks sentences as they arrive (e.g. from a streaming LLM response).
+    Each sentence is synthesized as soon as it is produced, so ElevenLabs
+    synthesis overlaps with generation of the following sentences and with
+    playback of the previous ones. Audio is streamed into one player for the
+    whole reply as it arrives, always in sentence order.
+    Calling interrupt_speech() stops playback and drops the remaining sentences.
+    
+    Args:
+        sentences (AsyncIterable[str]): Sentences to speak, in order
         
+    Raises:
+        ValueError: If API key is not configured
+        Exception: For ElevenLabs API errors, or errors raised by `sentences`
+    """
+    global _current_player
+    _check_api_key()
+    
+    _interrupt_event.clear()
+    # One chunk queue per sentence (filled by its synthesis task), in order
+    pending = asyncio.Queue()
+    synthesis_tasks = []
+    
+    async def produce():
+        # Keeps pulling sentences while earlier ones are synthesized and played
+        try:
+            async for sentence in sentences:
+                chunks = asyncio.Queue()
+                synthesis_tasks.append(asyncio.create_task(_synthesize(sentence, chunks)))
+                pending.put_nowait(chunks)
+        except Exception as e:
+            pending.put_nowait(e)
+        finally:
+            pending.put_nowait(None)
+    
+    producer = asyncio.create_task(produce())
+    player = _Player()
+    
+    try:
         # Notify frontend that MiniMe is about to talk
         if send_to_ui:
             send_to_ui({"event": "talk", "levels": [0.0] * 12})
         
-        # Process audio in chunks and extract levels
-        for chunk in audio_generator:
-            audio_chunks.append(chunk)
-            
-            # Extract levels from this chunk
-            if send_to_ui and len(chunk) > 0:
-                try:
-                    levels = extract_audio_levels(chunk)
-                    send_to_ui({"event": "talk", "levels": levels})
-                except Exception as e:
-                    # Continue even if level extraction fails
-                    pass
+        # Start the player while the first sentence is still being generated
+        await player.start()
+        _current_player = player
         
-        # Combine all chunks
-        audio_data = b''.join(audio_chunks)
+        playing = True
+        while playing:
+            chunks = await pending.get()
+            if chunks is None or _interrupt_event.is_set():
+                break
+            if isinstance(chunks, Exception):
+                raise chunks
+            
+            while True:
+                chunk = await chunks.get()
+                if chunk is None:
+                    break
+                if isinstance(chunk, Exception):
+                    raise _tts_error(chunk) from chunk
+                if not await player.write(chunk):
+                    playing = False
+                    break
         
-        # Play the audio
-        play(io.BytesIO(audio_data))
+        await player.finish()
+    finally:
+        _current_player = None
+        player.kill()
+        producer.cancel()
+        for task in synthesis_tasks:
+            task.cancel()
         
         # Notify frontend that talking is done
         if send_to_ui:
             send_to_ui({"event": "idle"})
-        
-    except Exception as e:
-        # Parse ElevenLabs API errors for better user feedback
-        error_str = str(e)
-        
-        # Notify frontend of error
-        if send_to_ui:
-            send_to_ui({"event": "idle"})
-        
-        # Check for permission errors
-        if "missing_permissions" in error_str or "text_to_speech" in error_str.lower():
-            error_msg = (
-                "❌ ElevenLabs API Error: Your API key is missing the 'text_to_speech' permission.\n"
-                "   Please go to https://elevenlabs.io/ and:\n"
-                "   1. Check your API key permissions\n"
-                "   2. Ensure 'text_to_speech' permission is enabled\n"
-                "   3. Update your API key in keys.env if needed"
-            )
-        elif "401" in error_str or "unauthorized" in error_str.lower():
-            error_msg = (
-                "❌ ElevenLabs API Error: Invalid or unauthorized API key.\n"
-                "   Please check your ELEVEN_API_KEY in keys.env"
-            )
-        elif "quota" in error_str.lower() or "limit" in error_str.lower():
-            error_msg = (
-                "❌ ElevenLabs API Error: Quota exceeded or rate limit reached.\n"
-                "   Please check your ElevenLabs account usage"
-            )
-        else:
-            error_msg = f"Error in ElevenLabs TTS: {error_str}"
-        
-        print(error_msg, file=sys.stderr, flush=True)
-        raise Exception(error_msg) from e
@@ -5,139 +5,220 @@ Provides real-time communication between Python backend and Electron frontend.
 """
 
 import asyncio
+import atexit
 import json
 import logging
+import os
+import queue
 import threading
-from typing import List, Optional
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional, Set
 
 try:
     import websockets
-    from websockets.server import WebSocketServerProtocol
+    from websockets.asyncio.server import ServerConnection
 except ImportError:
     print("⚠️  websockets not installed. Run: pip install websockets")
     websockets = None
-    WebSocketServerProtocol = None
+    ServerConnection = None
 
-logging.basicConfig(level=logging.INFO)
+# orjson serializes straight to bytes in C; fall back to the stdlib encoder
+try:
+    import orjson
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    orjson = None
+    
+    def _dumps(data) -> bytes:
+        return json.dumps(data, separators=(',', ':')).encode('utf-8')
+    
+    _loads = json.loads
+
+# uvloop (libuv-based event loop) is faster for the server; optional, not available on Windows
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# Log at INFO only when MINIME_DEBUG is set. Records are handed to a queue and written
+# to stderr by a listener thread, so log I/O never blocks the event loop.
+_DEBUG = bool(os.getenv('MINIME_DEBUG'))
+_log_queue = queue.SimpleQueue()
+_log_listener = QueueListener(_log_queue, logging.StreamHandler())
+logging.basicConfig(
+    level=logging.INFO if _DEBUG else logging.WARNING,
+    handlers=[QueueHandler(_log_queue)]
+)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
 
 # Global WebSocket server instance
 _wss: Optional[asyncio.Server] = None
-_clients: List[WebSocketServerProtocol] = []
+_clients: Set[ServerConnection] = set()
 _server_thread: Optional[threading.Thread] = None
 _loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_thread_id: Optional[int] = None
+# Set while start_server() runs, so send_to_ui can skip _loop.is_running() on every event
+_loop_running = False
+_call_soon_threadsafe = None
+_outbox: Optional[asyncio.Queue] = None
+_broadcaster_task: Optional[asyncio.Task] = None
+
+# Pre-serialized frames for the frequent events that carry no payload
+_PREPARED = {
+    event: _dumps({"event": event})
+    for event in ("connected", "listening", "wake", "thinking", "sleep", "idle")
+}
+
+
+def _serialize(data: dict) -> bytes:
+    """Serialize an event once to compact UTF-8 JSON, reusing prepared frames where possible."""
+    if len(data) == 1:
+        prepared = _PREPARED.get(data.get("event"))
+        if prepared is not None:
+            return prepared
+    return _dumps(data)
 
 
 async def handle_client(websocket, path=None):
     """Handle a new WebSocket client connection."""
     global _clients
-    _clients.append(websocket)
-    client_addr = getattr(websocket, 'remote_address', 'unknown')
-    logger.info(f"Frontend connected: {client_addr}")
+    _clients.add(websocket)
+    logger.info("Frontend connected: %s", websocket.remote_address)
     
     # Send connection confirmation
     try:
         await send_to_client(websocket, {"event": "connected"})
     except Exception as e:
-        logger.warning(f"Error sending connection confirmation: {e}")
+        logger.warning("Error sending connection confirmation: %s", e)
     
     try:
-        # Keep connection alive
-        async for message in websocket:
+        # Keep connection alive. Frames are received undecoded (no UTF-8 validation
+        # pass); the JSON parser validates the bytes itself.
+        while True:
+            message = await websocket.recv(decode=False)
             try:
-                data = json.loads(message)
-                logger.debug(f"Received from frontend: {data}")
+                data = _loads(message)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Received from frontend: %r", data)
             except json.JSONDecodeError:
-                logger.warning(f"Invalid JSON from frontend: {message}")
+                logger.warning("Invalid JSON from frontend: %r", message)
     except websockets.exceptions.ConnectionClosed:
         logger.info("Frontend disconnected")
     except Exception as e:
-        logger.error(f"Error in WebSocket handler: {e}")
+        logger.error("Error in WebSocket handler: %s", e)
     finally:
-        if websocket in _clients:
-            _clients.remove(websocket)
+        _clients.discard(websocket)
 
 
-async def send_to_client(websocket: WebSocketServerProtocol, data: dict):
+async def send_to_client(websocket: ServerConnection, data: dict):
     """Send data to a specific client."""
     try:
-        await websocket.send(json.dumps(data))
+        await websocket.send(_serialize(data))
     except websockets.exceptions.ConnectionClosed:
         logger.warning("Client connection closed")
 
 
+async def _broadcaster():
+    """
+    Send queued messages to all connected clients (runs for the server's lifetime).
+    Messages queued in the same tick are coalesced into one frame holding a JSON array.
+    """
+    while True:
+        message = await _outbox.get()
+        
+        if not _outbox.empty():
+            batch = [message]
+            while not _outbox.empty():
+                batch.append(_outbox.get_nowait())
+            # Messages are already serialized JSON, so join them without re-encoding
+            message = b"[" + b",".join(batch) + b"]"
+        
+        # Writes to every open client without awaiting; closed clients are skipped
+        # and removed by handle_client when their connection ends
+        websockets.broadcast(_clients, message)
+
+
 def send_to_ui(data: dict):
     """
     Broadcast data to all connected frontend clients.
-    This is the main function to call from the backend.
+    This is the main function to call from the backend (safe from any thread;
+    cheapest when called on the server's own event loop).
     
     Args:
         data (dict): Data to send, e.g. {"event": "wake"} or {"event": "talk", "levels": [0.2, 0.6, 0.8]}
     """
-    global _clients, _loop
-    
     if not _clients:
         return
     
-    if _loop is None or not _loop.is_running():
+    if not _loop_running:
         logger.warning("WebSocket server not running, cannot send message")
         return
     
-    message = json.dumps(data)
-    
-    # Schedule send on the event loop
-    async def broadcast():
-        disconnected = []
-        for client in _clients:
-            try:
-                # Check if client is still open (websockets 15.x uses different property)
-                is_open = getattr(client, 'open', None)
-                if is_open is None:
-                    # Try alternative check
-                    is_open = not getattr(client, 'closed', True)
-                
-                if is_open:
-                    await client.send(message)
-                else:
-                    disconnected.append(client)
-            except websockets.exceptions.ConnectionClosed:
-                disconnected.append(client)
-            except Exception as e:
-                logger.warning(f"Error sending to client: {e}")
-                disconnected.append(client)
-        
-        # Remove disconnected clients
-        for client in disconnected:
-            if client in _clients:
-                _clients.remove(client)
-    
-    # Run in the event loop
-    asyncio.run_coroutine_threadsafe(broadcast(), _loop)
+    # Hand the message to the broadcaster task, crossing threads only if we have to
+    message = _serialize(data)
+    if threading.get_ident() == _loop_thread_id:
+        _outbox.put_nowait(message)
+    else:
+        _call_soon_threadsafe(_outbox.put_nowait, message)
 
 
 async def start_server():
     """Start the WebSocket server."""
-    global _wss, _loop
-    _loop = asyncio.get_event_loop()
+    global _wss, _loop, _loop_thread_id, _loop_running, _call_soon_threadsafe, _outbox, _broadcaster_task
+    _loop = asyncio.get_running_loop()
+    _loop_thread_id = threading.get_ident()
+    _call_soon_threadsafe = _loop.call_soon_threadsafe
+    _outbox = asyncio.Queue()
+    _broadcaster_task = asyncio.create_task(_broadcaster())
+    _loop_running = True
     
     try:
         # Use the correct websockets.serve signature for websockets 15.x
         # The handler will be called with (websocket, path) automatically
-        _wss = await websockets.serve(
+        async with websockets.serve(
             handle_client,
             "localhost",
             8081,
+            max_size=2**16,
+            # Events are tiny JSON payloads; per-message deflate costs more than it saves
+            compression=None,
             ping_interval=20,
             ping_timeout=10,
             close_timeout=10
-        )
-        logger.info("🌐 WebSocket server started on ws://localhost:8081")
-        await asyncio.Future()  # Run forever
+        ) as server:
+            _wss = server
+            logger.info("🌐 WebSocket server started on ws://localhost:8081")
+            # Returns once stop_server() closes the server
+            await server.serve_forever()
     except Exception as e:
-        logger.error(f"Error starting WebSocket server: {e}")
+        logger.error("Error starting WebSocket server: %s", e)
         import traceback
         traceback.print_exc()
         raise
+    finally:
+        _loop_running = False
+        _wss = None
+        _broadcaster_task.cancel()
+
+
+def start_server_task() -> Optional[asyncio.Task]:
+    """
+    Start the WebSocket server as a task on the running event loop, so the
+    server and the caller share one loop and send_to_ui never crosses threads.
+    
+    Returns:
+        asyncio.Task: The server task (finishes after stop_server()), or None if unavailable
+    """
+    if websockets is None:
+        logger.error("websockets library not installed. Run: pip install websockets")
+        return None
+    
+    task = asyncio.create_task(start_server())
+    logger.info("✅ WebSocket server task started")
+    return task
 
 
 def start_server_thread():
@@ -154,9 +235,12 @@ def start_server_thread():
     
     def run_server():
         try:
-            asyncio.run(start_server())
+            if uvloop is not None:
+                uvloop.run(start_server())
+            else:
+                asyncio.run(start_server())
         except Exception as e:
-            logger.error(f"WebSocket server error: {e}")
+            logger.error("WebSocket server error: %s", e)
     
     _server_thread = threading.Thread(target=run_server, daemon=True)
     _server_thread.start()
@@ -165,20 +249,16 @@ def start_server_thread():
 
 def stop_server():
     """Stop the WebSocket server."""
-    global _wss, _server_thread, _clients, _loop
-    
-    _clients.clear()
-    
-    if _wss:
-        _wss.close()
-        _wss = None
+    global _wss, _server_thread, _loop, _loop_running
     
-    if _loop and _loop.is_running():
-        _loop.call_soon_threadsafe(_loop.stop)
+    # Close the server on its own loop; serve_forever() then returns, connected
+    # clients are closed (and removed by their handlers), and the thread exits
+    if _wss and _loop_running:
+        _loop_running = False
+        _call_soon_threadsafe(_wss.close)
     
     if _server_thread and _server_thread.is_alive():
-        # Thread will exit when loop stops
-        pass
+        _server_thread.join(timeout=2)
     
     logger.info("WebSocket server stopped")
 
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+MiniMe API Clients Module
+Shared OpenAI and ElevenLabs clients, so every call reuses the same
+HTTP connection pool instead of paying a new TCP+TLS handshake per turn.
+"""
+
+import asyncio
+
+import httpx
+from elevenlabs.client import AsyncElevenLabs
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+from config import ELEVEN_API_KEY, HTTP_KEEPALIVE_EXPIRY, OPENAI_API_KEY
+
+# ElevenLabs' default request timeout (only applied by the SDK to its own HTTP client)
+_ELEVENLABS_TIMEOUT = 240
+
+
+def _connection_limits() -> httpx.Limits:
+    """Connection pool limits that keep idle connections open between turns."""
+    return httpx.Limits(
+        max_connections=100,
+        max_keepalive_connections=20,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+    )
+
+# Global client instances
+_openai_client = None
+_elevenlabs_client = None
+
+
+def get_openai_client():
+    """Get or create the shared OpenAI client (None if no API key is configured)."""
+    global _openai_client
+    if _openai_client is None and OPENAI_API_KEY:
+        _openai_client = AsyncOpenAI(
+            api_key=OPENAI_API_KEY,
+            http_client=DefaultAsyncHttpxClient(limits=_connection_limits())
+        )
+    return _openai_client
+
+
+def get_elevenlabs_client():
+    """Get or create the shared ElevenLabs client (None if no API key is configured)."""
+    global _elevenlabs_client
+    if _elevenlabs_client is None and ELEVEN_API_KEY:
+        _elevenlabs_client = AsyncElevenLabs(
+            api_key=ELEVEN_API_KEY,
+            httpx_client=httpx.AsyncClient(
+                timeout=_ELEVENLABS_TIMEOUT,
+                follow_redirects=True,
+                limits=_connection_limits()
+            )
+        )
+    return _elevenlabs_client
+
+
+async def prewarm_clients():
+    """
+    Opens keep-alive connections to OpenAI and ElevenLabs ahead of a turn, so the
+    first real request doesn't pay the TCP+TLS handshake. Idle connections are
+    closed after HTTP_KEEPALIVE_EXPIRY (or sooner by the server), so call this
+    again when a conversation starts.
+    Errors are ignored (the first real request will simply open its own connection).
+    """
+    requests = []
+    openai_client = get_openai_client()
+    if openai_client:
+        requests.append(openai_client.models.list())
+    elevenlabs_client = get_elevenlabs_client()
+    if elevenlabs_client:
+        requests.append(elevenlabs_client.models.list())
+    
+    await asyncio.gather(*requests, return_exceptions=True)
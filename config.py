@@ -4,6 +4,7 @@ MiniMe Configuration Module
 Centralized configuration and environment variable loading.
 """
 
+import functools
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -12,17 +13,19 @@ from dotenv import load_dotenv
 PROJECT_ROOT = Path(__file__).parent
 ENV_FILE = PROJECT_ROOT / "keys.env"
 
-# Load environment variables
-load_dotenv(ENV_FILE)
+# Load environment variables (once, here; other modules import the values below)
+if ENV_FILE.exists():
+    load_dotenv(ENV_FILE)
 
 # API Keys
-PICOVOICE_KEY = os.getenv('PICOVOICE_KEY')
-ELEVEN_API_KEY = os.getenv('ELEVEN_API_KEY') or os.getenv('ELEVEN_LAB_API_KEY')
-OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
-ELEVEN_VOICE_ID = os.getenv('ELEVEN_VOICE_ID', 'BZLr92pCdlwYqmn82yuB')
+PICOVOICE_KEY = os.environ.get('PICOVOICE_KEY')
+ELEVEN_API_KEY = os.environ.get('ELEVEN_API_KEY') or os.environ.get('ELEVEN_LAB_API_KEY')
+OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
+ELEVEN_VOICE_ID = os.environ.get('ELEVEN_VOICE_ID', 'BZLr92pCdlwYqmn82yuB')
 
 # File paths
 WAKE_WORD_MODEL = PROJECT_ROOT / 'wakeword' / 'minime.ppn'
+WAKE_WORD_MODEL_PATH = str(WAKE_WORD_MODEL)  # Plain string for os.path checks and Porcupine
 SOUL_PROMPT_FILE = PROJECT_ROOT / 'agent' / 'soul_prompt.txt'
 
 # Audio settings
@@ -31,6 +34,7 @@ AUDIO_FORMAT = 'int16'
 AUDIO_CHANNELS = 1
 AUDIO_RATE = 16000
 SILENCE_THRESHOLD = 150
+SILENCE_THRESHOLD_SQ = SILENCE_THRESHOLD * SILENCE_THRESHOLD  # Compared against mean squared amplitude (no sqrt per frame)
 SILENCE_DURATION = 2.5
 MAX_RECORDING_DURATION = 30
 AUTO_STOP_DURATION = 5.0  # Auto-stop after this many seconds if audio detected
@@ -39,12 +43,47 @@ AUTO_STOP_DURATION = 5.0  # Auto-stop after this many seconds if audio detected
 LLM_MODEL = "gpt-4o-mini"
 LLM_TEMPERATURE = 0.9
 LLM_MAX_TOKENS = 150  # Reduced for less verbose responses
+LLM_MAX_HISTORY_TOKENS = 2000  # Oldest turns are dropped once the history exceeds this
+
+# Response cache settings (replies to repeated user utterances skip the LLM)
+RESPONSE_CACHE_SIZE = 128  # Max cached replies (0 disables the cache)
+RESPONSE_CACHE_SEMANTIC = False  # Also match similar utterances via embeddings (costs an API call per miss)
+RESPONSE_CACHE_SIMILARITY = 0.93  # Min cosine similarity for a semantic cache hit
+EMBEDDING_MODEL = "text-embedding-3-small"
 
 # TTS settings
 TTS_MODEL = "eleven_monolingual_v1"
+TTS_SAMPLE_RATE = 22050
+TTS_OUTPUT_FORMAT = f"pcm_{TTS_SAMPLE_RATE}"  # Raw 16-bit mono PCM: played without decoding, levels read directly
+
+# API connection settings
+HTTP_KEEPALIVE_EXPIRY = 300.0  # Seconds an idle API connection is kept open (httpx default is 5)
+
+# Sleep command phrases (matched as whole words, case-insensitive)
+SLEEP_PHRASES = frozenset({
+    "ok bye",
+    "okay bye",
+    "goodbye",
+    "good bye",
+    "bye",
+    "bye minime",
+    "sleep",
+    "go to sleep",
+    "rest",
+    "rest now",
+    "quiet",
+    "go away",
+    "stop",
+    "later",
+    "you can sleep",
+})
 
+@functools.lru_cache(maxsize=1)
 def validate_config():
-    """Validate that all required configuration is present."""
+    """
+    Validate that all required configuration is present.
+    A successful result is cached; failures are re-checked on every call.
+    """
     errors = []
     
     if not PICOVOICE_KEY or PICOVOICE_KEY == 'your_picovoice_access_key_here':
@@ -56,7 +95,7 @@ def validate_config():
     if not OPENAI_API_KEY:
         errors.append("OPENAI_API_KEY not found in keys.env")
     
-    if not WAKE_WORD_MODEL.exists():
+    if not os.path.exists(WAKE_WORD_MODEL_PATH):
         errors.append(f"Wake word model not found: {WAKE_WORD_MODEL}")
     
     if errors:
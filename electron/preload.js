@@ -2,10 +2,13 @@ const { contextBridge } = require('electron');
 
 let socket;
 let messageHandlers = [];
+const decoder = new TextDecoder();
 
 function connectWebSocket() {
   try {
     socket = new WebSocket('ws://localhost:8081');
+    // Backend sends pre-encoded UTF-8 JSON as binary frames
+    socket.binaryType = 'arraybuffer';
 
     socket.onopen = () => {
       console.log('✅ Connected to MiniMe backend WebSocket');
@@ -25,13 +28,18 @@ function connectWebSocket() {
 
     socket.onmessage = (event) => {
       try {
-        const data = JSON.parse(event.data);
-        messageHandlers.forEach(handler => {
-          try {
-            handler(data);
-          } catch (e) {
-            console.error('Error in message handler:', e);
-          }
+        const text = typeof event.data === 'string' ? event.data : decoder.decode(event.data);
+        const data = JSON.parse(text);
+        // Backend coalesces bursts of events into a single array frame
+        const events = Array.isArray(data) ? data : [data];
+        events.forEach(evt => {
+          messageHandlers.forEach(handler => {
+            try {
+              handler(evt);
+            } catch (e) {
+              console.error('Error in message handler:', e);
+            }
+          });
         });
       } catch (e) {
         console.error('Error parsing WebSocket message:', e);
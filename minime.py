@@ -4,88 +4,152 @@ MiniMe - Complete AI Agent Pipeline
 Wake → Listen → Transcribe → LLM → TTS → Speak
 """
 
+import asyncio
 import os
 import sys
+import threading
 import traceback
 
-# Force unbuffered output for real-time visibility
+# Line-buffer output for real-time visibility: every print is flushed at its newline,
+# so prints below need no flush=True
 if hasattr(sys.stdout, 'reconfigure'):
     sys.stdout.reconfigure(line_buffering=True)
 if hasattr(sys.stderr, 'reconfigure'):
     sys.stderr.reconfigure(line_buffering=True)
 
 # Import modules
-from agent.llm import generate_response, reset_conversation
+from agent.llm import load_tokenizer, reset_conversation, stream_sentences
 from agent.sleep_handler import get_sleep_message, is_sleep_command
 from agent.wake_detector import WakeWordDetector
 from audio.recorder import record_until_silence
 from audio.transcriber import transcribe_audio
-from audio.tts import speak_text
+from audio.tts import interrupt_speech, speak_sentences, speak_text
+from clients import prewarm_clients
 from config import validate_config
 
 # Import WebSocket server
 try:
-    from backend.ws_server import start_server_thread, send_to_ui, stop_server
+    from backend.ws_server import start_server_task, send_to_ui, stop_server
     WS_AVAILABLE = True
 except ImportError:
-    print("⚠️  WebSocket server not available. Install: pip install websockets", flush=True)
+    print("⚠️  WebSocket server not available. Install: pip install websockets")
     WS_AVAILABLE = False
     send_to_ui = None
 
+# uvloop (libuv-based event loop) is faster for the agent and WebSocket server; optional
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 
-def main():
+async def speak_with_barge_in(detector: WakeWordDetector, speech) -> bool:
+    """
+    Runs a speech coroutine while listening for the wake word in the background.
+    Saying "Hey MiniMe" while MiniMe is talking cuts the speech off.
+    
+    Args:
+        detector (WakeWordDetector): The (already open) wake word detector
+        speech: Coroutine that plays MiniMe's speech
+        
+    Returns:
+        bool: True if the speech was interrupted by the wake word
+    """
+    stop_listening = threading.Event()
+    listener = asyncio.create_task(
+        asyncio.to_thread(detector.listen_for_wake_word, stop_listening)
+    )
+    
+    def on_wake_word(task):
+        if not task.cancelled() and task.result():
+            interrupt_speech()
+    
+    listener.add_done_callback(on_wake_word)
+    
+    try:
+        await speech
+    finally:
+        # Stop the listener and wait for it so the detector is free for the next listen
+        stop_listening.set()
+        await listener
+    
+    return listener.result()
+
+
+async def main():
     """Main agent loop."""
-    print("=" * 60, flush=True)
-    print("🤖 MiniMe Agent - Starting...", flush=True)
-    print("=" * 60, flush=True)
+    print("=" * 60)
+    print("🤖 MiniMe Agent - Starting...")
+    print("=" * 60)
     
     # Validate configuration
     try:
         validate_config()
-        print("✅ Configuration validated", flush=True)
+        print("✅ Configuration validated")
     except ValueError as e:
-        print(f"❌ Configuration error: {e}", flush=True)
+        print(f"❌ Configuration error: {e}")
         sys.exit(1)
     
-    print("\nSay 'Hey MiniMe' to activate!", flush=True)
-    print("Press Ctrl+C to exit\n", flush=True)
+    print("\nSay 'Hey MiniMe' to activate!")
+    print("Press Ctrl+C to exit\n")
     
     # Start WebSocket server for frontend communication
+    # (runs on this event loop, alongside the agent)
+    server_task = None
     if WS_AVAILABLE:
         try:
-            start_server_thread()
-            print("✅ WebSocket server started on ws://localhost:8081", flush=True)
+            server_task = start_server_task()
+            print("✅ WebSocket server started on ws://localhost:8081")
         except Exception as e:
-            print(f"⚠️  Could not start WebSocket server: {e}", flush=True)
-            print("⚠️  Continuing without frontend connection...\n", flush=True)
+            print(f"⚠️  Could not start WebSocket server: {e}")
+            print("⚠️  Continuing without frontend connection...\n")
     
     detector = None
     audio_data = None
     
+    # Blocking audio calls (wake word listening, recording) run in worker threads.
+    # On shutdown, stop_audio ends them and audio_worker is awaited before the
+    # detector is cleaned up, so native resources are never freed mid-call.
+    stop_audio = threading.Event()
+    audio_worker = None
+    
+    # Warm up API connections and load the tokenizer while the wake word detector initializes
+    prewarm_task = asyncio.create_task(prewarm_clients())
+    tokenizer_task = asyncio.create_task(asyncio.to_thread(load_tokenizer))
+    
     try:
         # Initialize wake word detector
-        print("[INIT] Initializing wake word detector...", flush=True)
-        detector = WakeWordDetector()
-        print("[INIT] Wake word detector ready!\n", flush=True)
+        print("[INIT] Initializing wake word detector...")
+        detector = await asyncio.to_thread(WakeWordDetector)
+        print("[INIT] Wake word detector ready!\n")
         
         # Main loop
         while True:
             try:
                 # Step 1: Wait for wake word
-                print("👂 Listening for wake word...", flush=True)
+                print("👂 Listening for wake word...")
                 if send_to_ui:
                     send_to_ui({"event": "listening"})
                 
-                if not detector.listen_for_wake_word():
-                    print("[EXIT] Wake word listener stopped.", flush=True)
+                # Blocking audio calls run in a worker thread to keep the event loop free
+                # (shielded, so cancelling main() leaves the thread for shutdown to await)
+                audio_worker = asyncio.ensure_future(
+                    asyncio.to_thread(detector.listen_for_wake_word, stop_audio)
+                )
+                if not await asyncio.shield(audio_worker):
+                    print("[EXIT] Wake word listener stopped.")
                     break
                 
-                print("🔔 Wake word detected! Hey MiniMe!\n", flush=True)
-                print("💬 Starting continuous conversation mode...\n", flush=True)
+                print("🔔 Wake word detected! Hey MiniMe!\n")
+                print("💬 Starting continuous conversation mode...\n")
                 
                 if send_to_ui:
                     send_to_ui({"event": "wake"})
                 
+                # Re-warm API connections (idle ones may have been closed since startup)
+                # while the first message is recorded
+                prewarm_task = asyncio.create_task(prewarm_clients())
+                
                 # Reset conversation when wake word is detected (new conversation session)
                 reset_conversation()
                 
@@ -96,18 +160,21 @@ def main():
                     turn_count += 1
                     # Step 2: Record audio
                     if turn_count == 1:
-                        print("[STEP 2] Starting audio recording...", flush=True)
+                        print("[STEP 2] Starting audio recording...")
                     else:
-                        print(f"[TURN {turn_count}] Recording your response...", flush=True)
-                    audio_data = record_until_silence()
-                    print(f"[STEP 2] Recording complete\n", flush=True)
+                        print(f"[TURN {turn_count}] Recording your response...")
+                    audio_worker = asyncio.ensure_future(
+                        asyncio.to_thread(record_until_silence, stop_event=stop_audio)
+                    )
+                    audio_data = await asyncio.shield(audio_worker)
+                    print(f"[STEP 2] Recording complete\n")
                     
                     # Step 3: Transcribe
-                    print("[STEP 3] Starting transcription...", flush=True)
+                    print("[STEP 3] Starting transcription...")
                     if send_to_ui:
                         send_to_ui({"event": "thinking"})
-                    user_text = transcribe_audio(audio_data)
-                    print(f"[STEP 3] Transcription: '{user_text}'\n", flush=True)
+                    user_text = await transcribe_audio(audio_data)
+                    print(f"[STEP 3] Transcription: '{user_text}'\n")
                     
                     # Close audio data buffer
                     if audio_data:
@@ -115,54 +182,57 @@ def main():
                         audio_data = None
                     
                     if not user_text:
-                        print("⚠️  No speech detected. Listening again...\n", flush=True)
+                        print("⚠️  No speech detected. Listening again...\n")
                         continue
                     
                     # Check for sleep command
                     if is_sleep_command(user_text):
-                        print("😴 Sleep command detected!", flush=True)
+                        print("😴 Sleep command detected!")
                         sleep_msg = get_sleep_message()
-                        print("🔊 MiniMe saying goodnight...\n", flush=True)
+                        print("🔊 MiniMe saying goodnight...\n")
                         if send_to_ui:
                             send_to_ui({"event": "sleep"})
                         try:
-                            speak_text(sleep_msg)
+                            await speak_text(sleep_msg)
                         except Exception:
                             pass  # Continue even if TTS fails
                         reset_conversation()  # Reset conversation for next session
                         conversation_active = False
                         if send_to_ui:
                             send_to_ui({"event": "idle"})
-                        print("-" * 60, flush=True)
-                        print("MiniMe is sleeping. Say 'Hey MiniMe' to wake me up again!\n", flush=True)
+                        print("-" * 60)
+                        print("MiniMe is sleeping. Say 'Hey MiniMe' to wake me up again!\n")
                         break
                     
-                    # Step 4: Generate MiniMe response
-                    print("[STEP 4] Generating MiniMe response...", flush=True)
-                    mini_response = generate_response(user_text)
-                    print(f"[STEP 4] Response generated\n", flush=True)
-                    
-                    # Step 5: Speak response
-                    print("🔊 MiniMe speaking...\n", flush=True)
+                    # Step 4 + 5: Generate MiniMe response and speak it sentence by sentence
+                    print("[STEP 4] Generating MiniMe response...")
+                    print("🔊 MiniMe speaking...\n")
                     try:
-                        speak_text(mini_response)
-                        print("[STEP 5] TTS playback complete!\n", flush=True)
+                        interrupted = await speak_with_barge_in(
+                            detector, speak_sentences(stream_sentences(user_text))
+                        )
+                        if interrupted:
+                            print("🔔 Wake word heard - MiniMe stopped talking.\n")
+                        else:
+                            print("[STEP 5] TTS playback complete!\n")
                     except Exception as tts_error:
-                        print(f"⚠️  TTS Error: {tts_error}", flush=True)
-                        print("⚠️  MiniMe response generated but could not be spoken.", flush=True)
-                        print("⚠️  Response was: " + mini_response[:100] + "...\n", flush=True)
+                        print(f"⚠️  TTS Error: {tts_error}")
+                        print("⚠️  MiniMe response could not be spoken.\n")
                     
                     # Continue conversation - wait for next input
-                    print("💬 Conversation continues... (speak now, or say 'ok bye'/'goodbye' to end)\n", flush=True)
+                    print("💬 Conversation continues... (speak now, or say 'ok bye'/'goodbye' to end)\n")
                 
             except KeyboardInterrupt:
-                print("\n\n⚠️  Interrupted by user. Shutting down...", flush=True)
+                print("\n\n⚠️  Interrupted by user. Shutting down...")
                 break
+            except asyncio.CancelledError:
+                print("\n\n⚠️  Interrupted by user. Shutting down...")
+                raise
             except Exception as e:
-                print(f"\n❌ Error in main loop: {e}", flush=True)
-                print("Full traceback:", flush=True)
+                print(f"\n❌ Error in main loop: {e}")
+                print("Full traceback:")
                 traceback.print_exc()
-                print("", flush=True)
+                print("")
                 if audio_data:
                     audio_data.close()
                     audio_data = None
@@ -170,18 +240,33 @@ def main():
                 continue
     
     finally:
-        # Cleanup
+        # Cleanup: stop the audio worker thread and wait for it before freeing the detector
+        prewarm_task.cancel()
+        tokenizer_task.cancel()
+        stop_audio.set()
+        if audio_worker is not None:
+            try:
+                await audio_worker
+            except Exception:
+                pass
         if detector:
             detector.cleanup()
         if audio_data:
             audio_data.close()
-        if WS_AVAILABLE:
+        if server_task:
             try:
                 stop_server()
+                await asyncio.wait_for(server_task, timeout=2)
             except Exception:
                 pass
-        print("\n👋 MiniMe shutting down. Goodbye!", flush=True)
+        print("\n👋 MiniMe shutting down. Goodbye!")
 
 
 if __name__ == '__main__':
-    main()
+    try:
+        if uvloop is not None:
+            uvloop.run(main())
+        else:
+            asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -1,4 +1,4 @@
-import React, { useEffect, useState, useRef } from 'react';
+import React, { useEffect, useRef } from 'react';
 import { MiniMeFace } from './components/MiniMeFace';
 import { useMicLevel } from './hooks/useMicLevel';
 import { useBlink } from './state/useBlink';
@@ -7,9 +7,11 @@ import { useMiniMeState, MiniMeState } from './state/useMiniMeState';
 function App() {
   const micLevel = useMicLevel();
   const isBlinking = useBlink();
-  const [backendEvent, setBackendEvent] = useState<{ event: string; levels?: number[] } | null>(null);
   const lastBackendEventRef = useRef<number>(Date.now());
 
+  // Use state machine to manage all states
+  const { state, levels, handleBackendEvent } = useMiniMeState(micLevel, isBlinking);
+
   // Listen for WebSocket messages from backend
   useEffect(() => {
     // Check if MiniMeSocket is available (from preload.js)
@@ -20,19 +22,16 @@ function App() {
 
     console.log('✅ Setting up WebSocket message handler...');
 
-    // Listen for messages from backend
+    // Listen for messages from backend (every event is applied, in order)
     window.MiniMeSocket.onMessage((msg: any) => {
       console.log('📨 Received from backend:', msg);
       lastBackendEventRef.current = Date.now();
-      setBackendEvent(msg);
+      handleBackendEvent(msg);
     });
 
     // Initial state
     console.log('🎬 Initializing MiniMe...');
-  }, []);
-
-  // Use state machine to manage all states
-  const { state, levels } = useMiniMeState(micLevel, backendEvent, isBlinking);
+  }, [handleBackendEvent]);
 
   // Update levels for listening state (real-time mic levels)
   const finalLevels = React.useMemo(() => {
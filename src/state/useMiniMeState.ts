@@ -1,4 +1,4 @@
-import { useState, useEffect, useRef } from 'react';
+import { useState, useEffect, useRef, useCallback } from 'react';
 
 export type MiniMeState = 
   | 'idle' 
@@ -9,6 +9,11 @@ export type MiniMeState =
   | 'blink' 
   | 'sleep';
 
+export interface BackendEvent {
+  event: string;
+  levels?: number[];
+}
+
 interface MiniMeStateConfig {
   state: MiniMeState;
   levels: number[];
@@ -17,15 +22,69 @@ interface MiniMeStateConfig {
   wakeStartTime: number | null;
 }
 
+/**
+ * Applies one backend event to the state machine config
+ */
+function applyBackendEvent(prev: MiniMeStateConfig, backendEvent: BackendEvent): MiniMeStateConfig {
+  const now = Date.now();
+
+  if (backendEvent.event === 'wake') {
+    return {
+      ...prev,
+      state: 'wake',
+      levels: [],
+      lastBackendEvent: now,
+      wakeStartTime: now,
+    };
+  } else if (backendEvent.event === 'thinking') {
+    return {
+      ...prev,
+      state: 'thinking',
+      levels: [],
+      lastBackendEvent: now,
+    };
+  } else if (backendEvent.event === 'talk') {
+    return {
+      ...prev,
+      state: 'talk',
+      levels: backendEvent.levels || [],
+      lastBackendEvent: now,
+    };
+  } else if (backendEvent.event === 'idle') {
+    return {
+      ...prev,
+      state: 'idle',
+      levels: [],
+      lastBackendEvent: now,
+    };
+  } else if (backendEvent.event === 'sleep') {
+    return {
+      ...prev,
+      state: 'sleep',
+      levels: [],
+      lastBackendEvent: now,
+    };
+  } else if (backendEvent.event === 'listening') {
+    return {
+      ...prev,
+      state: 'listening',
+      levels: [],
+      lastBackendEvent: now,
+    };
+  }
+  return prev;
+}
+
 /**
  * MiniMe State Machine
- * Manages all avatar states with priority rules
+ * Manages all avatar states with priority rules.
+ * Backend events are passed to handleBackendEvent, which applies every event in
+ * order (events arriving together are batched by React, so none are dropped).
  */
 export function useMiniMeState(
   micLevel: number,
-  backendEvent: { event: string; levels?: number[] } | null,
   isBlinking: boolean
-): { state: MiniMeState; levels: number[] } {
+): { state: MiniMeState; levels: number[]; handleBackendEvent: (backendEvent: BackendEvent) => void } {
   const [config, setConfig] = useState<MiniMeStateConfig>({
     state: 'idle',
     levels: [],
@@ -41,56 +100,9 @@ export function useMiniMeState(
     setConfig(prev => ({ ...prev, micLevel }));
   }, [micLevel]);
 
-  useEffect(() => {
-    if (!backendEvent) return;
-
-    const now = Date.now();
-
-    if (backendEvent.event === 'wake') {
-      setConfig(prev => ({
-        ...prev,
-        state: 'wake',
-        levels: [],
-        lastBackendEvent: now,
-        wakeStartTime: now,
-      }));
-    } else if (backendEvent.event === 'thinking') {
-      setConfig(prev => ({
-        ...prev,
-        state: 'thinking',
-        levels: [],
-        lastBackendEvent: now,
-      }));
-    } else if (backendEvent.event === 'talk') {
-      setConfig(prev => ({
-        ...prev,
-        state: 'talk',
-        levels: backendEvent.levels || [],
-        lastBackendEvent: now,
-      }));
-    } else if (backendEvent.event === 'idle') {
-      setConfig(prev => ({
-        ...prev,
-        state: 'idle',
-        levels: [],
-        lastBackendEvent: now,
-      }));
-    } else if (backendEvent.event === 'sleep') {
-      setConfig(prev => ({
-        ...prev,
-        state: 'sleep',
-        levels: [],
-        lastBackendEvent: now,
-      }));
-    } else if (backendEvent.event === 'listening') {
-      setConfig(prev => ({
-        ...prev,
-        state: 'listening',
-        levels: [],
-        lastBackendEvent: now,
-      }));
-    }
-  }, [backendEvent]);
+  const handleBackendEvent = useCallback((backendEvent: BackendEvent) => {
+    setConfig(prev => applyBackendEvent(prev, backendEvent));
+  }, []);
 
   // Handle wake mode timeout (500ms)
   useEffect(() => {
@@ -185,6 +197,7 @@ export function useMiniMeState(
   return {
     state: finalState,
     levels: config.levels,
+    handleBackendEvent,
   };
 }
 
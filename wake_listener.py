@@ -5,25 +5,24 @@ Detects "Hey MiniMe" wake word using Picovoice Porcupine.
 """
 
 import os
+import queue
 import sys
-from dotenv import load_dotenv
-import numpy as np
 import pvporcupine
 import pyaudio
 
-# Load environment variables from keys.env
-load_dotenv('keys.env')
+# keys.env is loaded once by config
+from config import PICOVOICE_KEY, WAKE_WORD_MODEL_PATH
 
 def main():
     # Get Picovoice access key
-    access_key = os.getenv('PICOVOICE_KEY')
+    access_key = PICOVOICE_KEY
     if not access_key or access_key == 'your_picovoice_access_key_here':
         print("ERROR: Please set your PICOVOICE_KEY in keys.env")
         print("Get your key from: https://console.picovoice.ai/")
         sys.exit(1)
     
     # Path to the wake word model file
-    keyword_path = os.path.join('wakeword', 'minime.ppn')
+    keyword_path = WAKE_WORD_MODEL_PATH
     
     if not os.path.exists(keyword_path):
         print(f"ERROR: Wake word model file not found: {keyword_path}")
@@ -40,16 +39,25 @@ def main():
         print(f"ERROR: Failed to initialize Porcupine: {e}")
         sys.exit(1)
     
+    # Frames captured by PortAudio's callback thread, consumed by the detection loop
+    # below, so reading the next frame overlaps with processing the current one
+    frames = queue.SimpleQueue()
+    
+    def on_audio(in_data, frame_count, time_info, status):
+        frames.put(in_data)
+        return (None, pyaudio.paContinue)
+    
     # Initialize PyAudio
     pa = pyaudio.PyAudio()
     
-    # Open audio stream
+    # Open audio stream (callback mode: PortAudio reads in the background)
     audio_stream = pa.open(
         rate=porcupine.sample_rate,
         channels=1,
         format=pyaudio.paInt16,
         input=True,
-        frames_per_buffer=porcupine.frame_length
+        frames_per_buffer=porcupine.frame_length,
+        stream_callback=on_audio
     )
     
     print("Listening for 'Hey MiniMe'...")
@@ -57,13 +65,11 @@ def main():
     
     try:
         while True:
-            # Read audio frame
-            pcm = audio_stream.read(porcupine.frame_length)
-            # Convert bytes to numpy array of int16
-            pcm = np.frombuffer(pcm, dtype=np.int16)
+            # Next audio frame from the capture thread
+            pcm = frames.get()
             
-            # Check for wake word
-            keyword_index = porcupine.process(pcm)
+            # Check for wake word (zero-copy int16 view of the frame, no NumPy array per frame)
+            keyword_index = porcupine.process(memoryview(pcm).cast('h'))
             
             if keyword_index >= 0:
                 print("Wake word detected!")